@@ -92,6 +92,8 @@ class Config:
             self.config.metrics.allow_list.remove('[static]')
             static_list = u.list_dirs(u.get_path('static/'))
             self.config.metrics.allow_list.extend(['/static/' + i for i in static_list])
+        # allow_list 转 frozenset (O(1) 查找)
+        self.config.metrics.allow_set = frozenset(self.config.metrics.allow_list)
 
         if self.config.main.debug:
             # *此处还未设置日志等级, 需手动判断*
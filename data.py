@@ -1,19 +1,22 @@
 # coding: utf-8
 
+from collections import OrderedDict, defaultdict
 from datetime import datetime
+from os import stat
 from logging import getLogger
-from threading import Thread
+from threading import Lock, Thread
 from time import sleep, time
 from typing import Any
 from io import BytesIO
 
+from contextlib import nullcontext
+
 from werkzeug.security import safe_join
-from flask import Flask
+from flask import Flask, has_app_context
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import JSON, Integer, Float, String, Boolean, Text, DateTime
+from sqlalchemy import JSON, Integer, Float, String, Boolean, Text, DateTime, event, select, text, update
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.exc import SQLAlchemyError
-from objtyping import to_primitive
 import pytz
 import schedule
 
@@ -24,6 +27,8 @@ l = getLogger(__name__)
 
 db = SQLAlchemy()
 LIMIT = 1024
+METRICS_PENDING_LIMIT = 1000000
+'''写入持续失败时, 单路径暂存增量的上限'''
 
 # -----
 
@@ -60,6 +65,19 @@ class _DeviceStatusData(db.Model):
     last_updated: Mapped[float] = mapped_column(Float, default=time, onupdate=time)
     '''(本设备) 数据最后更新时间 (utc timestamp)'''
 
+    def to_dict(self) -> dict[str, Any]:
+        '''
+        转换为 dict (固定结构, 避免反射遍历的开销)
+        '''
+        return {
+            'id': self.id,
+            'show_name': self.show_name,
+            'using': self.using,
+            'status': self.status,
+            'fields': self.fields,
+            'last_updated': self.last_updated
+        }
+
 
 class _MetricsMetaData(db.Model):
     '''
@@ -109,6 +127,21 @@ class Data:
         perf = u.perf_counter()
         self._app = app
         self._c = config
+        # 时区对象只构造一次
+        self._tz = pytz.timezone(self._c.main.timezone)
+        # allow_list 的 frozenset 由配置加载时生成 (兜底: 直接构造 ConfigModel 时未设置)
+        self._metrics_allow = self._c.metrics.allow_set or frozenset(self._c.metrics.allow_list)
+        # metrics 内存缓冲 (定时批量落盘, 避免每个请求都 commit)
+        self._metrics_buf: dict[str, int] = defaultdict(int)
+        self._metrics_buf_lock = Lock()
+        # metrics 返回缓存 (数据只在落盘 / 刷新时变化, 期间无需重查重建)
+        self._metrics_resp_cache: dict[str, Any] | None = None
+        # 文件缓存 (LRU, 总字节数以 cache_max_bytes 为上限)
+        self._cache: OrderedDict[tuple[str, str], tuple[float, bytes]] = OrderedDict()
+        self._cache_size: int = 0
+        self._cache_lock = Lock()
+        # 文本缓存 (随字节缓存失效, 避免每次命中都重新解码)
+        self._text_cache: dict[tuple[str, str], tuple[float, str]] = {}
         # 配置数据库地址
         app.config['SQLALCHEMY_DATABASE_URI'] = self._c.main.database
         app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
@@ -116,15 +149,28 @@ class Data:
         # 初始化数据库
         db.init_app(app)
         with app.app_context():
+            if db.engine.dialect.name == 'sqlite':
+                # sqlite -> 每个连接建立时设置 pragma (在 create_all 之前注册)
+                event.listen(db.engine, 'connect', self._sqlite_on_connect)
             db.create_all()
-            main_data = _MainData.query.first()
+            # 主键固定 (默认 0), session.get 可直接命中 identity map
+            main_data = db.session.get(_MainData, 0) or _MainData.query.first()
             if not main_data:
                 l.debug(f'[data] main_data not exist, creating a new one')
                 main_data = _MainData()
                 db.session.add(main_data)
                 db.session.commit()
 
-            metrics_metadata = _MetricsMetaData.query.first()
+            # 缓存主数据行 (只有一行, 读取直接走缓存, 写入时同步更新)
+            self._main_id: int = main_data.id
+            self._main_cache = _MainData(
+                id=main_data.id,
+                status=main_data.status,
+                private_mode=main_data.private_mode,
+                last_updated=main_data.last_updated
+            )
+
+            metrics_metadata = db.session.get(_MetricsMetaData, 0) or _MetricsMetaData.query.first()
             if self._c.metrics.enabled and not metrics_metadata:
                 l.debug(f'[data] metrics_metadata not exist, creating a new one')
                 metrics_metadata = _MetricsMetaData()
@@ -137,23 +183,50 @@ class Data:
 
         l.debug(f'[data] init took {perf()}ms')
 
+    @staticmethod
+    def _sqlite_on_connect(dbapi_conn, _):
+        '''
+        (仅 sqlite) 连接建立时设置 pragma:
+        WAL 模式让读不被写阻塞, NORMAL 同步减少每次 commit 的 fsync
+        '''
+        cur = dbapi_conn.cursor()
+        cur.execute('PRAGMA journal_mode=WAL')
+        cur.execute('PRAGMA synchronous=NORMAL')
+        cur.execute('PRAGMA temp_store=MEMORY')
+        cur.close()
+
     def _throw(self, e: SQLAlchemyError):
         '''
         简化抛出 sql call failed error
         '''
         l.error(f'SQL Call Failed: {e}')
+        if has_app_context():
+            # 复用的 context 没有 teardown 清理会话, 需显式回滚失败事务
+            db.session.rollback()
         raise u.APIUnsuccessful(500, 'Database Error')
 
+    def _ctx(self):
+        '''
+        获取 app context: 已在 context 内 (如 flask 请求中) 时直接复用, 避免重复进出的开销
+        '''
+        if has_app_context():
+            return nullcontext()
+        return self._app.app_context()
+
     def _schedule_loop(self):
         if self._c.metrics.enabled:
             # 先执行一次
             self._metrics_refresh()
             schedule.every().day.at('00:00:00', self._c.main.timezone).do(self._metrics_refresh)  # metrics check
-        schedule.every(self._c.main.cache_age).seconds.do(self._clean_cache)  # cache
+            schedule.every(5).seconds.do(self._flush_metrics)  # metrics 批量落盘
 
-        while True:
-            schedule.run_pending()
-            sleep(1)
+        # 后台线程常驻一个 app context, 各任务无需反复进出
+        with self._app.app_context():
+            while True:
+                schedule.run_pending()
+                # 睡到下一个任务触发时间 (上限 60s 以防任务变动, 下限 1s 防忙等)
+                delay = schedule.idle_seconds()
+                sleep(max(1, min(delay, 60)) if delay is not None else 60)
 
     # --- 主程序数据访问
 
@@ -162,20 +235,21 @@ class Data:
         '''
         当前的状态 id
         '''
-        try:
-            with self._app.app_context():
-                maindata: _MainData = _MainData.query.first()  # type: ignore
-                return maindata.status
-        except SQLAlchemyError as e:
-            self._throw(e)
+        return self._main_cache.status
 
     @status_id.setter
     def status_id(self, value: int):
         try:
-            with self._app.app_context():
-                maindata: _MainData = _MainData.query.first()  # type: ignore
-                maindata.status = value
+            now = time()
+            with self._ctx():
+                db.session.execute(
+                    update(_MainData)
+                    .where(_MainData.id == self._main_id)
+                    .values(status=value, last_updated=now)
+                )
                 db.session.commit()
+            self._main_cache.status = value
+            self._main_cache.last_updated = now
         except SQLAlchemyError as e:
             self._throw(e)
 
@@ -183,17 +257,16 @@ class Data:
         '''
         用 id 获取状态
         '''
-        try:
-            return True, self._c.status.status_list[status_id]
-        except IndexError:
-            return False, _StatusItemModel(
-                id=self.status_id,
-                name='Unknown',
-                desc='未知的标识符，可能是配置问题。',
-                color='error'
-            )
-        except SQLAlchemyError as e:
-            self._throw(e)
+        status_list = self._c.status.status_list
+        if 0 <= status_id < len(status_list):
+            return True, status_list[status_id]
+        # 越界 -> 未知状态 (用条件判断而非捕获 IndexError, 热路径无异常开销)
+        return False, _StatusItemModel(
+            id=self.status_id,
+            name='Unknown',
+            desc='未知的标识符，可能是配置问题。',
+            color='error'
+        )
 
     @property
     def status(self) -> tuple[bool, _StatusItemModel]:
@@ -215,27 +288,28 @@ class Data:
         }
         '''
         status = self.status
-        return status[0], to_primitive(self.status[1])  # type: ignore
+        return status[0], status[1].model_dump()
 
     @property
     def private_mode(self) -> bool:
         '''
         是否开启隐私模式 (不返回设备状态)
         '''
-        try:
-            with self._app.app_context():
-                maindata: _MainData = _MainData.query.first()  # type: ignore
-                return maindata.private_mode
-        except SQLAlchemyError as e:
-            self._throw(e)
+        return self._main_cache.private_mode
 
     @private_mode.setter
     def private_mode(self, value: bool):
         try:
-            with self._app.app_context():
-                maindata: _MainData = _MainData.query.first()  # type: ignore
-                maindata.private_mode = value
+            now = time()
+            with self._ctx():
+                db.session.execute(
+                    update(_MainData)
+                    .where(_MainData.id == self._main_id)
+                    .values(private_mode=value, last_updated=now)
+                )
                 db.session.commit()
+            self._main_cache.private_mode = value
+            self._main_cache.last_updated = now
         except SQLAlchemyError as e:
             self._throw(e)
 
@@ -244,20 +318,19 @@ class Data:
         '''
         数据最后更新时间 (utc)
         '''
-        try:
-            with self._app.app_context():
-                maindata: _MainData = _MainData.query.first()  # type: ignore
-                return maindata.last_updated
-        except SQLAlchemyError as e:
-            self._throw(e)
+        return self._main_cache.last_updated
 
     @last_updated.setter
     def last_updated(self, value: float):
         try:
-            with self._app.app_context():
-                maindata: _MainData = _MainData.query.first()  # type: ignore
-                maindata.last_updated = value
+            with self._ctx():
+                db.session.execute(
+                    update(_MainData)
+                    .where(_MainData.id == self._main_id)
+                    .values(last_updated=value)
+                )
                 db.session.commit()
+            self._main_cache.last_updated = value
         except SQLAlchemyError as e:
             self._throw(e)
 
@@ -272,7 +345,7 @@ class Data:
             # 判断隐私模式
             if self.private_mode:
                 return {}
-            with self._app.app_context():
+            with self._ctx():
                 devices: list[_DeviceStatusData] = _DeviceStatusData.query.all().copy()
                 return {d.id: d for d in devices}
         except SQLAlchemyError as e:
@@ -281,7 +354,7 @@ class Data:
     @property
     def _raw_device_list_dict(self) -> dict[str, dict[str, str | int | float | bool]]:
         devices = self._raw_device_list
-        return to_primitive(devices, format_date_time=False)  # type: ignore
+        return {k: v.to_dict() for k, v in devices.items()}
 
     @property
     def device_list(self) -> dict[str, dict[str, Any]]:
@@ -289,41 +362,41 @@ class Data:
         排序后设备列表
         '''
         try:
+            # 判断隐私模式 (读取缓存, 无 sql)
             if self.private_mode:
-                # 隐私模式
-                devicelst = {}
-            elif self._c.status.using_first:
-                # 使用中优先
-                devicelst = {}  # devicelst = device_using
-                device_not_using = {}
-                device_unknown = {}
-                for k, v in self._raw_device_list_dict.items():
-                    if v.get('using') == True:  # * 正在使用
-                        devicelst[k] = v
-                    elif v.get('using') == False:  # * 未在使用
-                        if self._c.status.not_using:
-                            v['status'] = self._c.status.not_using  # 如锁定了未在使用时状态名, 则替换
-                        device_not_using[k] = v
-                    else:  # * 未知
-                        device_unknown[k] = v
-                if self._c.status.sorted:
-                    devicelst = dict(sorted(devicelst.items()))
-                    device_not_using = dict(sorted(device_not_using.items()))
-                    device_unknown = dict(sorted(device_unknown.items()))
-                # 追加到末尾
-                devicelst.update(device_not_using)
-                devicelst.update(device_unknown)
-            else:
-                # 正常获取
-                devicelst = self._raw_device_list_dict
-                # 如锁定了未在使用时状态名, 则替换
-                if self._c.status.not_using:
-                    for d in devicelst.keys():
-                        if devicelst[d].get('using') == False:
-                            devicelst[d]['status'] = self._c.status.not_using
+                return {}
+            # 单次查询取出所有列 (元组而非 orm 对象), 排序交给 sql
+            with self._ctx():
+                query = select(
+                    _DeviceStatusData.id,
+                    _DeviceStatusData.show_name,
+                    _DeviceStatusData.using,
+                    _DeviceStatusData.status,
+                    _DeviceStatusData.fields,
+                    _DeviceStatusData.last_updated
+                )
                 if self._c.status.sorted:
-                    devicelst = dict(sorted(devicelst.items()))
-            return devicelst
+                    query = query.order_by(_DeviceStatusData.id)
+                rows = db.session.execute(query).all()
+            # 单趟构建: 顺便替换未在使用状态名
+            not_using = self._c.status.not_using
+            devices = []
+            for r in rows:
+                v = {
+                    'id': r.id,
+                    'show_name': r.show_name,
+                    'using': r.using,
+                    'status': r.status,
+                    'fields': r.fields,
+                    'last_updated': r.last_updated
+                }
+                if v['using'] == False and not_using:
+                    v['status'] = not_using  # 如锁定了未在使用时状态名, 则替换
+                devices.append(v)
+            if self._c.status.using_first:
+                # 使用中优先: 一次稳定排序 (正在使用 -> 未在使用 -> 未知, 组内保持原顺序)
+                devices.sort(key=lambda v: 0 if v['using'] == True else 1 if v['using'] == False else 2)
+            return {v['id']: v for v in devices}
         except SQLAlchemyError as e:
             self._throw(e)
 
@@ -334,7 +407,7 @@ class Data:
         :param id: 设备 id
         '''
         try:
-            with self._app.app_context():
+            with self._ctx():
                 device: _DeviceStatusData | None = _DeviceStatusData.query.filter_by(id=id).first()
                 return device
         except SQLAlchemyError as e:
@@ -356,7 +429,7 @@ class Data:
         :param fields: 扩展字段
         '''
         try:
-            with self._app.app_context():
+            with self._ctx():
                 device = _DeviceStatusData.query.filter_by(id=id).first()
                 if not id:
                     # 验证设备 id 不为空
@@ -384,7 +457,7 @@ class Data:
         :param id: 设备唯一 id
         '''
         try:
-            with self._app.app_context():
+            with self._ctx():
                 device: _DeviceStatusData | None = _DeviceStatusData.query.filter_by(id=id).first()
                 if device:
                     db.session.delete(device)
@@ -398,7 +471,7 @@ class Data:
         清除设备状态
         '''
         try:
-            with self._app.app_context():
+            with self._ctx():
                 _DeviceStatusData.query.delete()
                 db.session.commit()
                 self.last_updated = time()
@@ -415,14 +488,49 @@ class Data:
         :param count: 记录增加次数 (调试使用?)
         :param override: 是否直接替换值而不是增加
         '''
-        if not path in self._c.metrics.allow_list:
+        if not path in self._metrics_allow:
+            return
+        if not override:
+            # 仅累加内存计数, 由定时任务批量落盘
+            with self._metrics_buf_lock:
+                self._metrics_buf[path] += count
             return
+        # override -> 丢弃该路径未落盘的增量并直接写入
+        with self._metrics_buf_lock:
+            self._metrics_buf.pop(path, None)
         try:
-            with self._app.app_context():
-                metric: _MetricsData | None = _MetricsData.query.filter_by(path=path).first()
+            with self._ctx():
+                self._write_metrics({path: count}, override=True)
+                db.session.commit()
+            self._metrics_resp_cache = None
+        except SQLAlchemyError as e:
+            self._throw(e)
+
+    def _write_metrics(self, deltas: dict[str, int], override: bool = False):
+        '''
+        将 metrics 增量写入数据库 (需在 app context 内调用, 不 commit)
+
+        :param deltas: 路径 -> 增量 (或替换值)
+        :param override: 是否直接替换值而不是增加
+        '''
+        if db.engine.dialect.name == 'sqlite':
+            # sqlite -> 原子 upsert (executemany), 省去 select + orm 脏检查
+            if override:
+                action = 'daily=:c, weekly=:c, monthly=:c, yearly=:c, total=:c'
+            else:
+                action = 'daily=daily+:c, weekly=weekly+:c, monthly=monthly+:c, yearly=yearly+:c, total=total+:c'
+            db.session.execute(text(
+                'INSERT INTO metrics (path, daily, weekly, monthly, yearly, total) '
+                'VALUES (:p, :c, :c, :c, :c, :c) '
+                f'ON CONFLICT (path) DO UPDATE SET {action}'
+            ), [{'p': p, 'c': c} for p, c in deltas.items()])
+        else:
+            # 其他数据库 -> 回退到读改写
+            for p, c in deltas.items():
+                metric: _MetricsData | None = _MetricsData.query.filter_by(path=p).first()
                 if not metric:
                     metric = _MetricsData()
-                    metric.path = path
+                    metric.path = p
                     metric.daily = 0
                     metric.weekly = 0
                     metric.monthly = 0
@@ -430,20 +538,40 @@ class Data:
                     metric.total = 0
                     db.session.add(metric)
                 if override:
-                    metric.daily = count
-                    metric.weekly = count
-                    metric.monthly = count
-                    metric.yearly = count
-                    metric.total = count
+                    metric.daily = c
+                    metric.weekly = c
+                    metric.monthly = c
+                    metric.yearly = c
+                    metric.total = c
                 else:
-                    metric.daily += count
-                    metric.weekly += count
-                    metric.monthly += count
-                    metric.yearly += count
-                    metric.total += count
+                    metric.daily += c
+                    metric.weekly += c
+                    metric.monthly += c
+                    metric.yearly += c
+                    metric.total += c
+
+    def _flush_metrics(self):
+        '''
+        (定时执行) 将内存中累积的 metrics 增量一次性写入数据库
+        '''
+        with self._metrics_buf_lock:
+            if not self._metrics_buf:
+                return
+            buf, self._metrics_buf = self._metrics_buf, defaultdict(int)
+        try:
+            with self._ctx():
+                self._write_metrics(buf)
                 db.session.commit()
+            self._metrics_resp_cache = None
         except SQLAlchemyError as e:
-            self._throw(e)
+            l.error(f'[_flush_metrics] Error: {e}')
+            # 回滚失败事务 (常驻 context 下没有 teardown 清理会话)
+            if has_app_context():
+                db.session.rollback()
+            # 写入失败 -> 增量放回缓冲, 下次重试 (有上限, 防持续故障时无限累积)
+            with self._metrics_buf_lock:
+                for p, c in buf.items():
+                    self._metrics_buf[p] = min(self._metrics_buf[p] + c, METRICS_PENDING_LIMIT)
 
     @property
     def metrics_data(self) -> tuple[dict[str, int], dict[str, int], dict[str, int], dict[str, int], dict[str, int]]:
@@ -453,18 +581,27 @@ class Data:
         :return: (今日, 本周, 本月, 今年, 全部)
         '''
         try:
-            raw_metrics: list[_MetricsData] = _MetricsData.query.all()
+            # 只取列元组, 跳过 orm 对象构造
+            with self._ctx():
+                rows = db.session.execute(select(
+                    _MetricsData.path,
+                    _MetricsData.daily,
+                    _MetricsData.weekly,
+                    _MetricsData.monthly,
+                    _MetricsData.yearly,
+                    _MetricsData.total
+                )).all()
             daily = {}
             weekly = {}
             monthly = {}
             yearly = {}
             total = {}
-            for i in raw_metrics:
-                daily[i.path] = i.daily
-                weekly[i.path] = i.weekly
-                monthly[i.path] = i.monthly
-                yearly[i.path] = i.yearly
-                total[i.path] = i.total
+            for path, d, w, m, y, t in rows:
+                daily[path] = d
+                weekly[path] = w
+                monthly[path] = m
+                yearly[path] = y
+                total[path] = t
             return (daily, weekly, monthly, yearly, total)
         except SQLAlchemyError as e:
             self._throw(e)
@@ -477,9 +614,16 @@ class Data:
         :return: (今日, 本周, 本月, 今年, 全部)
         '''
         try:
-            raw_metric: _MetricsData | None = _MetricsData.query.filter_by(path='/').first()
-            if raw_metric:
-                return (raw_metric.daily, raw_metric.weekly, raw_metric.monthly, raw_metric.yearly, raw_metric.total)
+            with self._ctx():
+                row = db.session.execute(select(
+                    _MetricsData.daily,
+                    _MetricsData.weekly,
+                    _MetricsData.monthly,
+                    _MetricsData.yearly,
+                    _MetricsData.total
+                ).where(_MetricsData.path == '/')).first()
+            if row:
+                return tuple(row)
             else:
                 return (0, 0, 0, 0, 0)
         except SQLAlchemyError as e:
@@ -490,72 +634,84 @@ class Data:
         '''
         获取 metrics 返回
         '''
-        enabled = self._c.metrics.enabled
-        if enabled:
-            daily, weekly, monthly, yearly, total = self.metrics_data if enabled else ({}, {}, {}, {}, {})
-            now = datetime.now(pytz.timezone(self._c.main.timezone))
+        if not self._c.metrics.enabled:
             return {
                 'success': True,
-                'enabled': True,
-                'time': now.timestamp(),
-                'time_local': now.strftime('%Y-%m-%d %H:%M:%S'),
-                'timezone': self._c.main.timezone,
+                'enabled': False
+            }
+        # 计数数据只在落盘 / 刷新时变化 -> 缓存五个 dict, 每次只更新时间字段
+        cached = self._metrics_resp_cache
+        if cached is None:
+            daily, weekly, monthly, yearly, total = self.metrics_data
+            cached = {
                 'daily': daily,
                 'weekly': weekly,
                 'monthly': monthly,
                 'yearly': yearly,
                 'total': total
             }
-        else:
-            return {
-                'success': True,
-                'enabled': False
-            }
+            self._metrics_resp_cache = cached
+        now = datetime.now(self._tz)
+        return {
+            'success': True,
+            'enabled': True,
+            'time': now.timestamp(),
+            'time_local': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'timezone': self._c.main.timezone,
+            # 浅拷贝: 调用方 (如插件事件) 修改返回不会污染缓存
+            'daily': cached['daily'].copy(),
+            'weekly': cached['weekly'].copy(),
+            'monthly': cached['monthly'].copy(),
+            'yearly': cached['yearly'].copy(),
+            'total': cached['total'].copy()
+        }
 
     def _metrics_refresh(self):
         '''
         (在 每日 0 点 / 启动时 执行) 刷新 metrics 数据
         '''
         perf = u.perf_counter()
+        # 先落盘缓冲增量, 避免跨日计数归入错误周期
+        self._flush_metrics()
         try:
-            with self._app.app_context():
-                raw_metrics: list[_MetricsData] = _MetricsData.query.all()
-                meta_metrics: _MetricsMetaData = _MetricsMetaData.query.first()  # type: ignore
+            with self._ctx():
+                meta_metrics: _MetricsMetaData = db.session.get(_MetricsMetaData, 0) or _MetricsMetaData.query.first()  # type: ignore
 
                 # get today
-                now = datetime.now(pytz.timezone(self._c.main.timezone))
+                now = datetime.now(self._tz)
                 year = f'{now.year}'
                 month = f'{now.year}-{now.month}'
                 today = f'{now.year}-{now.month}-{now.day}'
                 week = f'{now.year}-{now.isocalendar().week}'
 
+                # 过期的列直接一条 update 归零 (不加载任何行)
                 if today != meta_metrics.today:
                     l.debug(f'[metrics] today changed: {meta_metrics.today} -> {today}')
                     meta_metrics.today = today
-                    for i in raw_metrics:
-                        i.daily = 0
+                    db.session.execute(update(_MetricsData).values(daily=0))
 
                 if week != meta_metrics.week:
                     l.debug(f'[metrics] week changed: {meta_metrics.week} -> {week}')
                     meta_metrics.week = week
-                    for i in raw_metrics:
-                        i.weekly = 0
+                    db.session.execute(update(_MetricsData).values(weekly=0))
 
                 if month != meta_metrics.month:
                     l.debug(f'[metrics] month changed: {meta_metrics.month} -> {month}')
                     meta_metrics.month = month
-                    for i in raw_metrics:
-                        i.monthly = 0
+                    db.session.execute(update(_MetricsData).values(monthly=0))
 
                 if year != meta_metrics.year:
                     l.debug(f'[metrics] year changed: {meta_metrics.year} -> {year}')
                     meta_metrics.year = year
-                    for i in raw_metrics:
-                        i.yearly = 0
+                    db.session.execute(update(_MetricsData).values(yearly=0))
 
                 db.session.commit()
+            self._metrics_resp_cache = None
         except SQLAlchemyError as e:
             l.error(f'[_metrics_refresh] Error: {e}')
+            # 回滚失败事务 (常驻 context 下没有 teardown 清理会话)
+            if has_app_context():
+                db.session.rollback()
         l.debug(f'[_metrics_refresh] took {perf()}ms')
 
     # --- 插件数据访问
@@ -565,7 +721,7 @@ class Data:
         获取插件数据 (没有则会创建)
         '''
         try:
-            with self._app.app_context():
+            with self._ctx():
                 plugin: _PluginData | None = _PluginData.query.filter_by(id=id).first()
                 if plugin is None:
                     plugin = _PluginData()
@@ -581,7 +737,7 @@ class Data:
         设置插件数据
         '''
         try:
-            with self._app.app_context():
+            with self._ctx():
                 plugin: _PluginData | None = _PluginData.query.filter_by(id=id).first()
                 if plugin is None:
                     plugin = _PluginData()
@@ -595,16 +751,15 @@ class Data:
 
     # --- 缓存系统
 
-    _cache: dict[str, tuple[float, BytesIO]] = {}
+    # _cache: (dirname, filename) -> (文件 mtime, 文件内容)
 
-    def get_cached_file(self, dirname: str, filename: str) -> BytesIO | None:
+    def _load_file(self, dirname: str, filename: str) -> tuple[bytes, float] | None:
         '''
-        加载文件 (经过缓存)
+        读取文件并维护字节缓存
 
         :param dirname: 路径
         :param filename: 文件名
-        :return bytesIO: (加载成功) 文件内容 **(字节流)**
-        :return None: (加载失败) 空
+        :return: (文件内容, 文件 mtime); 加载失败则为 None *(debug 模式下直接读取, mtime 为 0)*
         '''
         filepath = safe_join(u.get_path(dirname), filename)
         if not filepath:
@@ -614,52 +769,75 @@ class Data:
             if self._c.main.debug:
                 # debug -> load directly
                 with open(filepath, 'rb') as f:
-                    return BytesIO(f.read())
+                    return f.read(), 0.0
             else:
-                cache_key = f'f-{dirname}/{filename}'
-                # check cache & expire
-                now = time()
-                cached = self._cache.get(cache_key)
-                if cached and now - cached[0] < self._c.main.cache_age:
-                    # has cache, and not expired
-                    return cached[1]
-                else:
-                    # no cache, or expired
-                    with open(filepath, 'rb') as f:
-                        ret = BytesIO(f.read())
-                    self._cache[cache_key] = (now, ret)
-                    return ret
-        except FileNotFoundError or IsADirectoryError:
+                cache_key = (dirname, filename)
+                # 以文件 mtime 为失效依据 (文件未修改则不重读)
+                mtime = stat(filepath).st_mtime
+                with self._cache_lock:
+                    cached = self._cache.get(cache_key)
+                    if cached and cached[0] == mtime:
+                        # 命中缓存
+                        self._cache.move_to_end(cache_key)
+                        return cached[1], mtime
+                # no cache, or expired (读文件不占锁)
+                with open(filepath, 'rb') as f:
+                    data = f.read()
+                with self._cache_lock:
+                    cached = self._cache.get(cache_key)
+                    if cached:
+                        # 过期条目在此处惰性替换
+                        self._cache_size -= len(cached[1])
+                    self._cache[cache_key] = (mtime, data)
+                    self._cache.move_to_end(cache_key)
+                    self._cache_size += len(data)
+                    # 超出上限 -> 逐出最久未使用的条目
+                    while self._cache_size > self._c.main.cache_max_bytes and len(self._cache) > 1:
+                        evicted_key, (_, evicted) = self._cache.popitem(last=False)
+                        self._cache_size -= len(evicted)
+                        self._text_cache.pop(evicted_key, None)
+                return data, mtime
+        except (FileNotFoundError, IsADirectoryError):
             # not found / isn't file -> none
             return None
 
-    def get_cached_text(self, dirname: str, filename: str) -> str | None:
+    def get_cached_file(self, dirname: str, filename: str) -> BytesIO | None:
         '''
-        加载文本文件 (经过缓存)
+        加载文件 (经过缓存)
 
         :param dirname: 路径
         :param filename: 文件名
-        :return bytes: (加载成功) 文件内容 **(字符串)**
+        :return bytesIO: (加载成功) 文件内容 **(字节流)** *(每次返回新的 BytesIO, 避免并发读共享游标)*
         :return None: (加载失败) 空
         '''
-        raw = self.get_cached_file(dirname, filename)
-        if raw:
-            try:
-                return str(raw.getvalue(), encoding='utf-8')
-            except UnicodeDecodeError:
-                return None
-        else:
-            return None
+        loaded = self._load_file(dirname, filename)
+        return BytesIO(loaded[0]) if loaded else None
 
-    def _clean_cache(self):
+    def get_cached_text(self, dirname: str, filename: str) -> str | None:
         '''
-        清理过期缓存
+        加载文本文件 (经过缓存, 解码结果同样缓存)
+
+        :param dirname: 路径
+        :param filename: 文件名
+        :return bytes: (加载成功) 文件内容 **(字符串)**
+        :return None: (加载失败) 空
         '''
-        if self._c.main.debug:
-            return
-        now = time()
-        for name in self._cache.keys():
-            if now - self._cache.get(name, (now, ''))[0] > self._c.main.cache_age:
-                f = self._cache.pop(name, (0, None))[1]
-                if f:
-                    f.close()
+        loaded = self._load_file(dirname, filename)
+        if not loaded:
+            return None
+        data, mtime = loaded
+        cache_key = (dirname, filename)
+        if not self._c.main.debug:
+            with self._cache_lock:
+                cached = self._text_cache.get(cache_key)
+            if cached and cached[0] == mtime:
+                # 命中文本缓存, 跳过解码
+                return cached[1]
+        try:
+            decoded = str(data, encoding='utf-8')
+        except UnicodeDecodeError:
+            return None
+        if not self._c.main.debug:
+            with self._cache_lock:
+                self._text_cache[cache_key] = (mtime, decoded)
+        return decoded
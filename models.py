@@ -116,6 +116,14 @@ class _MainConfigModel(BaseModel):
     - *建议设置为 20 分钟 (1200s)*
     '''
 
+    cache_max_bytes: int = 33554432
+    '''
+    `main.cache_max_bytes`
+    静态资源缓存总大小上限 (字节)
+    - *超出时逐出最久未使用的文件 (LRU)*
+    - *默认为 32MB (33554432)*
+    '''
+
     cors_origins: list[str] | str = '*'
     '''
     `main.cors_origins`
@@ -300,6 +308,12 @@ class _MetricsConfigModel(BaseModel):
     *其中的 `[static]` 为特殊值, 匹配 static 目录中的所有文件*
     '''
 
+    allow_set: frozenset = frozenset()
+    '''
+    `allow_list` 的 frozenset 形式 (O(1) 查找)
+    - *应由 `config.Config.__init__()` 动态设置*
+    '''
+
 
 class ConfigModel(BaseModel):
     '''
@@ -1,27 +1,54 @@
 #!/usr/bin/python3
 # coding: utf-8
 
-from os import name, path, system
-from sys import argv
+from os import path
+from signal import SIGINT, SIGTERM, signal
+from subprocess import Popen
+from sys import argv, executable
 from time import sleep
 
 SERVER_PATH = 'main.py'  # main.py 相对路径
-WAIT_TIME = 5  # 等待时间 (s)
+WAIT_TIME = 5  # 异常退出时最大等待时间 (s)
 
 c = 0  # count
 selfn = argv[0]  # self
 dirn = path.dirname(selfn)  # self dir
 server = path.join(dirn, SERVER_PATH)  # main.py path
 print(f'[Start] Server path: {server}')
-while True:
-    c += 1
-    print(f'[Start] Starting server #{c}')
-    if name == 'nt':
-        # Windows
-        r = system(f'python {server}')
-    else:
-        # not Windows
-        r = system(f'python3 {server}')
-    print(f'[Start] #{c} exited with code {r}')
-    print(f'[Start] wait {WAIT_TIME}s')
-    sleep(WAIT_TIME)
+
+proc: Popen | None = None
+
+
+def _terminate(signum, frame):
+    # 收到终止信号 -> 转发给子进程
+    # (不可在 handler 内 wait: 主线程可能正阻塞在 proc.wait() 且持有其锁, 会死锁;
+    #  由主循环的 finally 统一回收子进程)
+    print(f'[Start] Received signal {signum}, stopping server')
+    if proc and proc.poll() is None:
+        proc.terminate()
+    raise SystemExit(0)
+
+
+signal(SIGTERM, _terminate)
+signal(SIGINT, _terminate)
+
+wait = 1  # 当前退避时间 (s)
+try:
+    while True:
+        c += 1
+        print(f'[Start] Starting server #{c}')
+        proc = Popen([executable, server])  # 直接 fork/exec (不经过 shell, 跨平台)
+        r = proc.wait()
+        print(f'[Start] #{c} exited with code {r}')
+        if r == 0:
+            # 正常退出 -> 立即重启
+            wait = 1
+            continue
+        # 异常退出 -> 指数退避, 上限 WAIT_TIME
+        print(f'[Start] wait {wait}s')
+        sleep(wait)
+        wait = min(wait * 2, WAIT_TIME)
+finally:
+    # 回收子进程 (信号中断 wait 时子进程可能尚未退出)
+    if proc and proc.poll() is None:
+        proc.wait()
@@ -51,9 +51,10 @@ class CustomFormatter(Formatter):
             self.symbols = {}
             self.default_symbol = ''
         self.timezone = timezone
+        self._tz = pytz.timezone(timezone) if timezone else None  # 时区对象只构造一次
 
     def format(self, record):
-        timestamp = (datetime.now(pytz.timezone(self.timezone)) if self.timezone else datetime.now()).strftime('[%Y-%m-%d %H:%M:%S]')  # 格式化时间
+        timestamp = (datetime.now(self._tz) if self._tz else datetime.now()).strftime('[%Y-%m-%d %H:%M:%S]')  # 格式化时间
         symbol = f' {self.symbols.get(record.levelname, self.default_symbol)}'  # 表情符号
         level = self.replaces.get(record.levelname, f'[{record.levelname}]')  # 日志等级
         file = relative_path(record.pathname)  # 源文件名
@@ -425,6 +426,18 @@ def deep_merge_dict(*dicts: dict) -> dict:
     if not dicts:
         return {}
 
+    # 快速路径: 两个无嵌套的扁平字典 (device_set 的 fields 合并热路径) 直接浅合并
+    if len(dicts) == 2:
+        d1, d2 = dicts
+        if (
+            isinstance(d1, dict) and isinstance(d2, dict)
+            and not any(isinstance(v, dict) for v in d1.values())
+            and not any(isinstance(v, dict) for v in d2.values())
+        ):
+            merged = d1.copy()
+            merged.update(d2)
+            return merged
+
     # 创建基础字典的深拷贝（避免修改原始输入）
     base = {}
     for d in dicts: